@@ -15,8 +15,11 @@ from .langgraph_engine import LangGraphEngine
 from .rag_chain import build_rag_chain
 from .weather import get_weather_for_city, summarize_weather_payload
 from .vectorstore import build_faiss_from_docs, load_faiss
+from .sharded_vectorstore import ShardedFAISS, build_sharded_faiss, load_sharded_faiss
 from .embeddings import get_embeddings
 from .llm_wrappers import get_llm
+from .warmup import warm_up, generate_questions, prepopulate_answers
+from .cache import CacheBackend, InMemoryCache, DiskCache, RedisCache, get_cache
 
 __all__ = [
     "settings",
@@ -27,6 +30,17 @@ __all__ = [
     "summarize_weather_payload",
     "build_faiss_from_docs",
     "load_faiss",
+    "ShardedFAISS",
+    "build_sharded_faiss",
+    "load_sharded_faiss",
     "get_embeddings",
     "get_llm",
+    "CacheBackend",
+    "InMemoryCache",
+    "DiskCache",
+    "RedisCache",
+    "get_cache",
+    "warm_up",
+    "generate_questions",
+    "prepopulate_answers",
 ]
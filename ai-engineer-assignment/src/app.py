@@ -7,13 +7,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import settings
-from src.data_loader import load_and_split_pdf
-from src.embeddings import get_embeddings
-from src.vectorstore import build_faiss_from_docs, load_faiss
-from src.llm_wrappers import get_llm
-from src.rag_chain import build_rag_chain
-from src.langgraph_engine import LangGraphEngine
-from pypdf.errors import EmptyFileError
+from src.pipeline import get_pipeline
 from langsmith import traceable
 import os
 
@@ -64,34 +58,17 @@ st.markdown(
 st.title("AI Pipeline: Weather + PDF RAG Demo")
 
 # --- Initialize pipeline ---
+# Built and warmed once per process; `python -m src.serve` does this before
+# the server accepts traffic, plain `streamlit run` on the first session
 @st.cache_resource
 def init_pipeline():
-    embeddings = get_embeddings()
-    persist_path = settings.FAISS_INDEX_PATH
+    return get_pipeline()
 
-    if os.path.exists(persist_path):
-        vectorstore = load_faiss(persist_path, embeddings)
-    else:
-        try:
-            docs = load_and_split_pdf(settings.PDF_PATH)
-        except FileNotFoundError as e:
-            st.error(f"PDF not found: {e}")
-            docs = []
-        except EmptyFileError as e:
-            st.error(f"PDF is empty or unreadable: {e}")
-            docs = []
-
-        if not docs:
-            vectorstore = None
-        else:
-            vectorstore = build_faiss_from_docs(docs, embeddings, persist_path=persist_path)
-
-    llm = get_llm()
-    rag = build_rag_chain(llm, vectorstore)
-    engine = LangGraphEngine(rag_chain=rag, llm=llm, openweather_api_key=settings.OPENWEATHER_API_KEY)
-    return engine
-
-engine = init_pipeline()
+pipeline = init_pipeline()
+for error in pipeline.errors:
+    st.error(error)
+
+engine = pipeline.engine
 
 @traceable  # logs the function call + input/output
 def handle_query(query: str):
@@ -0,0 +1,384 @@
+import abc
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from src.config import settings
+
+# Redis is only needed for the networked backend
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Sentinel so that falsy values (None, "", []) can still be cached
+_MISSING = object()
+
+# Deletes the lock only if it still holds our token, in one atomic step
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _dumps(value: Any) -> bytes:
+    # JSON rather than pickle: a shared store must never be able to run code on load
+    return json.dumps(value).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a short, stable cache key from arbitrary parts.
+    """
+    raw = "\x1f".join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(abc.ABC):
+    """
+    Base class for cache backends used by the engine.
+
+    Keys are prefixed with the backend's namespace, values expire after
+    `ttl` seconds (None means never) and `get_or_set` makes sure only one
+    caller computes a missing value while the others wait for it.
+    Backends that leave the process store values as JSON, so only
+    JSON-serializable values (strings, dicts, lists, numbers) can be cached.
+    """
+
+    # How long a cross-process fill lock is held at most, and how often waiters poll
+    lock_timeout: float = 30.0
+    poll_interval: float = 0.05
+
+    def __init__(self, namespace: str = "", default_ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        # Keys being computed right now, each with an event set once the fill ends.
+        # Entries are removed after the fill, so this only holds in-flight keys.
+        self._inflight: dict[str, threading.Event] = {}
+        self._inflight_guard = threading.Lock()
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Any:
+        """Return the stored value for a full key, or `_MISSING`."""
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Store a value under a full key."""
+
+    @abc.abstractmethod
+    def _delete(self, key: str) -> None:
+        """Remove a full key if present."""
+
+    def namespaced(self, name: str) -> "CacheBackend":
+        """
+        Return a view of this cache whose keys live under `name`.
+        The view shares storage (and locks) with the parent.
+        """
+        view = copy.copy(self)
+        view.namespace = f"{self.namespace}:{name}" if self.namespace else name
+        return view
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._get(self._full_key(key))
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._set(self._full_key(key), value, self._resolve_ttl(ttl))
+
+    def delete(self, key: str) -> None:
+        self._delete(self._full_key(key))
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value for `key`, computing it with `factory` on a miss.
+        Concurrent misses for the same key only call `factory` once; misses
+        for different keys never wait on each other.
+        """
+        full_key = self._full_key(key)
+        while True:
+            value = self._get(full_key)
+            if value is not _MISSING:
+                return value
+
+            with self._inflight_guard:
+                done = self._inflight.get(full_key)
+                owner = done is None
+                if owner:
+                    done = self._inflight[full_key] = threading.Event()
+            if not owner:
+                # Someone else is computing this key. Check again once they finish;
+                # if their factory failed, one of the waiters takes over.
+                done.wait()
+                continue
+
+            try:
+                # Another thread may have filled the key just before we took it over
+                value = self._get(full_key)
+                if value is _MISSING:
+                    value = self._fill(full_key, factory, self._resolve_ttl(ttl))
+                return value
+            finally:
+                with self._inflight_guard:
+                    del self._inflight[full_key]
+                done.set()
+
+    def _fill(self, key: str, factory: Callable[[], Any], ttl: Optional[float]) -> Any:
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+
+        while not self._acquire_fill_lock(key, token):
+            # Another process is computing this key; wait for its value
+            time.sleep(self.poll_interval)
+            value = self._get(key)
+            if value is not _MISSING:
+                return value
+            if time.monotonic() >= deadline:
+                # The holder looks stuck, compute it ourselves
+                break
+
+        try:
+            value = factory()
+            self._set(key, value, ttl)
+            return value
+        finally:
+            self._release_fill_lock(key, token)
+
+    def _acquire_fill_lock(self, key: str, token: str) -> bool:
+        """
+        Take the cross-process lock for filling `key`, or return False if another
+        process holds it. Backends that live inside one process need no lock.
+        """
+        return True
+
+    def _release_fill_lock(self, key: str, token: str) -> None:
+        """Release the lock taken by `_acquire_fill_lock`, only if it still holds `token`."""
+
+    def _full_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def _resolve_ttl(self, ttl: Optional[float]) -> Optional[float]:
+        return self.default_ttl if ttl is None else ttl
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Per-process LRU cache. Fastest option, but every replica keeps its own copy.
+    """
+
+    def __init__(self, max_entries: int = 1024, namespace: str = "", default_ttl: Optional[float] = None):
+        super().__init__(namespace=namespace, default_ttl=default_ttl)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache(CacheBackend):
+    """
+    SQLite-backed cache on local disk. Survives restarts and is shared by
+    every process on the same host. Stampede protection spans those
+    processes too: the first one to miss takes a lock row with an expiry
+    and the rest wait for its value. Expired rows are purged from `_set`
+    at most once every `purge_interval` seconds, so the file stays bounded.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str = "",
+        default_ttl: Optional[float] = None,
+        lock_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+        purge_interval: float = 60.0,
+    ):
+        super().__init__(namespace=namespace, default_ttl=default_ttl)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+        # A dict so namespaced views share one purge schedule
+        self._last_purge = {"at": time.monotonic()}
+        # One connection per thread; sqlite connections are not thread-safe
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locks "
+                "(key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Any:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self._delete(key)
+            return _MISSING
+        return _loads(value)
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, _dumps(value), expires_at),
+            )
+            if time.monotonic() - self._last_purge["at"] >= self.purge_interval:
+                self._last_purge["at"] = time.monotonic()
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                conn.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+
+    def _delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _acquire_fill_lock(self, key: str, token: str) -> bool:
+        now = time.time()
+        with self._connection() as conn:
+            # A lock left behind by a crashed process is taken over once it expires
+            conn.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO locks (key, token, expires_at) VALUES (?, ?, ?)",
+                (key, token, now + self.lock_timeout),
+            )
+        return cursor.rowcount == 1
+
+    def _release_fill_lock(self, key: str, token: str) -> None:
+        # Never delete a lock that expired and was taken by another process
+        with self._connection() as conn:
+            conn.execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+
+
+class RedisCache(CacheBackend):
+    """
+    Networked cache shared by all replicas. Works with any server that
+    speaks the Redis protocol. Stampede protection also spans replicas:
+    the first one to miss takes a short-lived lock and the rest wait for
+    its value instead of recomputing it.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        client: Any = None,
+        namespace: str = "",
+        default_ttl: Optional[float] = None,
+        lock_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+    ):
+        super().__init__(namespace=namespace, default_ttl=default_ttl)
+        if client is None:
+            if not redis:
+                raise ImportError("Redis cache support requires: pip install redis")
+            client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self._client = client
+        self._release_lock = client.register_script(_RELEASE_LOCK_SCRIPT)
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+
+    def _get(self, key: str) -> Any:
+        raw = self._client.get(key)
+        if raw is None:
+            return _MISSING
+        return _loads(raw)
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        px = max(int(ttl * 1000), 1) if ttl is not None else None
+        self._client.set(key, _dumps(value), px=px)
+
+    def _delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def _acquire_fill_lock(self, key: str, token: str) -> bool:
+        lock_ms = int(self.lock_timeout * 1000)
+        return bool(self._client.set(f"lock:{key}", token, nx=True, px=lock_ms))
+
+    def _release_fill_lock(self, key: str, token: str) -> None:
+        # Never delete a lock that expired and was taken by another replica
+        self._release_lock(keys=[f"lock:{key}"], args=[token])
+
+
+def is_shared_cache(cache: CacheBackend | None) -> bool:
+    """True if values outlive this process (disk or Redis), i.e. survive a restart."""
+    return cache is not None and not isinstance(cache, InMemoryCache)
+
+
+def get_cache(backend: str | None = None, namespace: str | None = None) -> CacheBackend | None:
+    """
+    Returns a cache backend based on CACHE_BACKEND in config, or None if caching is disabled.
+    """
+    backend = (backend or settings.CACHE_BACKEND).lower()
+    namespace = settings.CACHE_NAMESPACE if namespace is None else namespace
+
+    if backend == "none":
+        return None
+
+    elif backend == "memory":
+        return InMemoryCache(max_entries=settings.CACHE_MAX_ENTRIES, namespace=namespace)
+
+    elif backend == "disk":
+        return DiskCache(os.path.join(settings.CACHE_DIR, "cache.sqlite3"), namespace=namespace)
+
+    elif backend == "redis":
+        return RedisCache(url=settings.REDIS_URL, namespace=namespace)
+
+    else:
+        raise ValueError(
+            f"Unsupported CACHE_BACKEND: {backend}. Use 'memory', 'disk', 'redis' or 'none'."
+        )
@@ -2,7 +2,7 @@
 from pydantic_settings import BaseSettings
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import List, Optional
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 
@@ -13,6 +13,12 @@ class Settings(BaseSettings):
 
     OPENWEATHER_API_KEY: Optional[str] = None
     FAISS_INDEX_PATH: str = "faiss_index"
+    # Number of FAISS shards to build (1 = single index)
+    FAISS_NUM_SHARDS: int = 1
+    # Threads used to search shards (None = one per shard)
+    FAISS_SEARCH_WORKERS: Optional[int] = None
+    # Store chunks in a memory-mapped array docstore instead of index.pkl
+    FAISS_COMPACT_DOCSTORE: bool = False
     PDF_PATH: str = "data/sample.pdf"
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
 
@@ -27,6 +33,30 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4o-mini"
 
+    # Cache backend: "memory", "disk", "redis" or "none"
+    CACHE_BACKEND: str = "memory"
+    # Bump the namespace after re-indexing to drop stale answers
+    CACHE_NAMESPACE: str = "ai-engineer-assignment"
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_DIR: str = ".cache"
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Cache TTLs in seconds (None = never expire)
+    ANSWER_CACHE_TTL: Optional[int] = 3600
+    WEATHER_CACHE_TTL: Optional[int] = 600
+    EMBEDDING_CACHE_TTL: Optional[int] = 86400
+
+    # Warm-up run when the pipeline starts
+    WARMUP_ENABLED: bool = True
+    WARMUP_QUERIES: List[str] = []
+    # Upper bound on queries replayed at startup (each may be a live LLM call)
+    WARMUP_MAX_QUERIES: int = 50
+    # Questions generated at ingest time by `python -m src.warmup`
+    WARMUP_QUESTIONS_PATH: str = "warmup_questions.json"
+    WARMUP_QUESTIONS_PER_CHUNK: int = 2
+    # TTL for the answers that job pre-populates (None = never expire)
+    WARMUP_ANSWER_TTL: Optional[int] = None
+
     class Config:
         env_file = ".env"
 
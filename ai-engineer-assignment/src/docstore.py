@@ -0,0 +1,185 @@
+import json
+import mmap
+import os
+from collections.abc import Mapping
+from typing import Iterator, Union
+
+import numpy as np
+from langchain.docstore.base import Docstore
+from langchain.schema import Document
+
+TEXTS_FILE = "texts.bin"
+OFFSETS_FILE = "offsets.npy"
+PAGES_FILE = "pages.npy"
+SOURCE_IDS_FILE = "source_ids.npy"
+SOURCES_FILE = "sources.json"
+
+# Marks a missing page / source in the metadata columns
+NO_VALUE = -1
+
+
+class CompactDocstore(Docstore):
+    """
+    Read-only, array-backed docstore for FAISS.
+
+    Chunk texts live in one contiguous UTF-8 buffer addressed by an offsets
+    array, and metadata is stored column-wise (page, source id). Files are
+    memory-mapped, so nothing is materialized until a chunk is looked up;
+    `Document` objects are only built for the hits FAISS returns.
+    Only the `page` and `source` metadata keys are kept.
+    """
+
+    def __init__(
+        self,
+        texts,
+        offsets: np.ndarray,
+        pages: np.ndarray,
+        source_ids: np.ndarray,
+        sources: list[str],
+        path: str | None = None,
+    ):
+        self._texts = memoryview(texts)
+        self.offsets = offsets
+        self.pages = pages
+        self.source_ids = source_ids
+        self.sources = sources
+        # Directory the files are mapped from, if loaded from disk
+        self.path = path
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def text(self, i: int) -> str:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return str(self._texts[start:end], "utf-8")
+
+    def metadata(self, i: int) -> dict:
+        metadata: dict = {}
+        source_id = int(self.source_ids[i])
+        if source_id != NO_VALUE:
+            metadata["source"] = self.sources[source_id]
+        page = int(self.pages[i])
+        if page != NO_VALUE:
+            metadata["page"] = page
+        return metadata
+
+    def search(self, search: Union[str, int]) -> Union[str, Document]:
+        """Return the chunk at position `search`, or an error string if there is none."""
+        try:
+            i = int(search)
+        except (TypeError, ValueError):
+            return f"ID {search} not found."
+        if not 0 <= i < len(self):
+            return f"ID {search} not found."
+        return Document(page_content=self.text(i), metadata=self.metadata(i))
+
+    def touch(self) -> int:
+        """
+        Read one byte per page of every mapped file so the OS pulls them into
+        the page cache. Returns the number of bytes covered.
+        """
+        touched = 0
+        for buf in (self._texts, self.offsets, self.pages, self.source_ids):
+            data = np.frombuffer(buf, dtype=np.uint8)
+            data[::mmap.PAGESIZE].sum()
+            touched += data.nbytes
+        return touched
+
+    def save(self, path: str) -> None:
+        """
+        Write this docstore's files to `path`. Saving onto the directory it
+        is mapped from is a no-op, since rewriting a mapped file in place
+        would corrupt it.
+        """
+        if self.path and os.path.isdir(path) and os.path.samefile(self.path, path):
+            return
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, TEXTS_FILE), "wb") as f:
+            f.write(self._texts)
+        np.save(os.path.join(path, OFFSETS_FILE), np.asarray(self.offsets))
+        np.save(os.path.join(path, PAGES_FILE), np.asarray(self.pages))
+        np.save(os.path.join(path, SOURCE_IDS_FILE), np.asarray(self.source_ids))
+        with open(os.path.join(path, SOURCES_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.sources, f)
+
+    @staticmethod
+    def write(path: str, docs: list[Document]) -> None:
+        """
+        Write docs to `path` in the compact layout, in index order.
+        """
+        os.makedirs(path, exist_ok=True)
+        offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+        pages = np.full(len(docs), NO_VALUE, dtype=np.int32)
+        source_ids = np.full(len(docs), NO_VALUE, dtype=np.int32)
+        sources: dict[str, int] = {}
+
+        position = 0
+        with open(os.path.join(path, TEXTS_FILE), "wb") as f:
+            for i, doc in enumerate(docs):
+                data = doc.page_content.encode("utf-8")
+                f.write(data)
+                position += len(data)
+                offsets[i + 1] = position
+
+                page = doc.metadata.get("page")
+                if page is not None:
+                    pages[i] = int(page)
+                source = doc.metadata.get("source")
+                if source is not None:
+                    source_ids[i] = sources.setdefault(str(source), len(sources))
+
+        np.save(os.path.join(path, OFFSETS_FILE), offsets)
+        np.save(os.path.join(path, PAGES_FILE), pages)
+        np.save(os.path.join(path, SOURCE_IDS_FILE), source_ids)
+        with open(os.path.join(path, SOURCES_FILE), "w", encoding="utf-8") as f:
+            json.dump(list(sources), f)
+
+    @classmethod
+    def load(cls, path: str) -> "CompactDocstore":
+        """
+        Memory-map a docstore previously written with `write`.
+        """
+        texts_path = os.path.join(path, TEXTS_FILE)
+        if os.path.getsize(texts_path) == 0:
+            # mmap cannot map empty files
+            texts = b""
+        else:
+            with open(texts_path, "rb") as f:
+                texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        with open(os.path.join(path, SOURCES_FILE), encoding="utf-8") as f:
+            sources = json.load(f)
+        return cls(
+            texts,
+            offsets=np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r"),
+            pages=np.load(os.path.join(path, PAGES_FILE), mmap_mode="r"),
+            source_ids=np.load(os.path.join(path, SOURCE_IDS_FILE), mmap_mode="r"),
+            sources=sources,
+            path=path,
+        )
+
+
+class PositionalIds(Mapping):
+    """
+    `index_to_docstore_id` for a CompactDocstore: FAISS row i is docstore id i.
+    Replaces a dict holding one uuid string per chunk.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def __getitem__(self, i: int) -> int:
+        i = int(i)
+        if not 0 <= i < self.size:
+            raise KeyError(i)
+        return i
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.size))
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def is_compact_docstore(path: str) -> bool:
+    return os.path.exists(os.path.join(path, OFFSETS_FILE))
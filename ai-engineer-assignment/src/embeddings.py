@@ -1,7 +1,37 @@
 from langchain.embeddings import HuggingFaceEmbeddings
+from langchain.embeddings.base import Embeddings
+from src.cache import CacheBackend, make_key
 from src.config import settings
 
-def get_embeddings(model_name: str | None = None):
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model and reuses query vectors stored in a cache backend.
+    Document vectors are not cached: they live in the vector store already and
+    would crowd answers out of the shared cache.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: CacheBackend, ttl: int | None = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.ttl = ttl
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.cache.get_or_set(
+            make_key("query", text), lambda: self.embeddings.embed_query(text), ttl=self.ttl
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+
+def get_embeddings(model_name: str | None = None, cache: CacheBackend | None = None):
     model_name = model_name or settings.EMBEDDING_MODEL
     # Uses sentence-transformers under the hood
-    return HuggingFaceEmbeddings(model_name=model_name)
+    embeddings = HuggingFaceEmbeddings(model_name=model_name)
+    if cache is None:
+        return embeddings
+    # Vectors are only reusable for the model that produced them
+    return CachedEmbeddings(
+        embeddings, cache.namespaced(f"embeddings:{model_name}"), ttl=settings.EMBEDDING_CACHE_TTL
+    )
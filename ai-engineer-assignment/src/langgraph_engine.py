@@ -1,6 +1,11 @@
 import re
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, Dict, TypedDict
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
+from src.cache import CacheBackend, make_key
+from src.config import settings
 from src.weather import get_weather_for_city, summarize_weather_payload
 from src.rag_chain import build_rag_chain
 from langsmith import traceable
@@ -9,15 +14,41 @@ from langsmith import traceable
 WEATHER_KEYWORDS = {"weather", "temperature", "rain", "forecast", "sunny", "wind", "windy", "snow", "cloud"}
 
 class GraphState(TypedDict):
-    """State for the LangGraph workflow"""
+    """Per-request state for the LangGraph workflow.
+
+    Engine-scoped dependencies (RAG chain, LLM, API keys) are passed through
+    the run config instead, so they are not copied between nodes or traced.
+    """
     query: str
     response: str
     city: str
     weather_data: Dict[str, Any]
     is_weather_query: bool
-    rag_chain: Any
-    llm: Any
-    openweather_api_key: str
+
+# Key of the EngineContext inside config["configurable"]
+ENGINE_CONTEXT_KEY = "engine"
+
+@dataclass(frozen=True)
+class EngineContext:
+    """
+    Engine-scoped dependencies handed to every node through the run config.
+
+    They are kept in one object on purpose: langchain copies primitive
+    `configurable` values (such as an API key string) into run metadata,
+    which would send them to LangSmith with every trace.
+    """
+    rag_chain: Any = None
+    llm: Any = None
+    openweather_api_key: str = field(default="", repr=False)
+    answer_cache: CacheBackend | None = None
+    weather_cache: CacheBackend | None = None
+    # Seconds cached answers live; None keeps them until evicted
+    answer_ttl: float | None = None
+
+def get_engine_context(config: RunnableConfig | None) -> EngineContext:
+    """Return the engine-scoped dependencies from a run config"""
+    context = (config or {}).get("configurable", {}).get(ENGINE_CONTEXT_KEY)
+    return context if context is not None else EngineContext()
 
 def looks_like_weather_query(text: str) -> bool:
     """Check if the query is about weather"""
@@ -36,29 +67,38 @@ def extract_city_from_query(text: str) -> str | None:
         return m2.group(1).strip()
     return None
 
-def decision_node(state: GraphState) -> GraphState:
+def decision_node(state: GraphState) -> Dict[str, Any]:
     """Decision node that determines if query is about weather or should go to RAG"""
     query = state["query"]
     is_weather = looks_like_weather_query(query)
     
     return {
-        **state,
         "is_weather_query": is_weather,
         "city": extract_city_from_query(query) or "your location" if is_weather else ""
     }
 
-@traceable
-def weather_node(state: GraphState) -> GraphState:
+# Only trace the per-request state; the config holds the engine's heavyweight objects
+@traceable(process_inputs=lambda inputs: {"state": inputs.get("state")})
+def weather_node(state: GraphState, config: RunnableConfig) -> Dict[str, Any]:
     """Node that handles weather queries"""
+    context = get_engine_context(config)
     city = state["city"]
-    api_key = state["openweather_api_key"]
+    api_key = context.openweather_api_key
     
-    # Get weather data
-    payload = get_weather_for_city(city, api_key=api_key)
+    # Get weather data, shared across replicas when a cache is configured
+    weather_cache = context.weather_cache
+    if weather_cache is not None:
+        payload = weather_cache.get_or_set(
+            make_key(city.lower()),
+            lambda: get_weather_for_city(city, api_key=api_key),
+            ttl=settings.WEATHER_CACHE_TTL,
+        )
+    else:
+        payload = get_weather_for_city(city, api_key=api_key)
     summary = summarize_weather_payload(payload)
     
     # Optionally enhance with LLM
-    llm = state["llm"]
+    llm = context.llm
     if llm:
         try:
             prompt = f"Summarize the following weather for a user in one friendly sentence:\n\n{summary}"
@@ -69,29 +109,49 @@ def weather_node(state: GraphState) -> GraphState:
         response = summary
     
     return {
-        **state,
         "weather_data": payload,
         "response": response
     }
 
-def rag_node(state: GraphState) -> GraphState:
+def normalize_query(text: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry"""
+    return " ".join(text.lower().split())
+
+def answer_cache_key(query: str) -> str:
+    """Key of a query's RAG answer in the answer cache"""
+    return make_key(normalize_query(query))
+
+def run_rag_chain(rag_chain: Any, query: str) -> Any:
+    """Call the RAG chain with whichever interface it exposes"""
+    # Try different ways to call the RAG chain
+    if hasattr(rag_chain, 'run'):
+        return rag_chain.run(query)
+    elif hasattr(rag_chain, 'invoke'):
+        return rag_chain.invoke({"query": query})
+    else:
+        return f"Error: RAG chain doesn't have expected methods. Type: {type(rag_chain)}"
+
+def rag_node(state: GraphState, config: RunnableConfig) -> Dict[str, Any]:
     """Node that handles RAG queries"""
     query = state["query"]
-    rag_chain = state["rag_chain"]
+    context = get_engine_context(config)
+    rag_chain = context.rag_chain
+    answer_cache = context.answer_cache
     
     try:
-        # Try different ways to call the RAG chain
-        if hasattr(rag_chain, 'run'):
-            response = rag_chain.run(query)
-        elif hasattr(rag_chain, 'invoke'):
-            response = rag_chain.invoke({"query": query})
+        if answer_cache is not None:
+            # Failed calls raise before anything is stored, so errors are never cached
+            response = answer_cache.get_or_set(
+                answer_cache_key(query),
+                lambda: run_rag_chain(rag_chain, query),
+                ttl=context.answer_ttl,
+            )
         else:
-            response = f"Error: RAG chain doesn't have expected methods. Type: {type(rag_chain)}"
+            response = run_rag_chain(rag_chain, query)
     except Exception as e:
         response = f"Error processing RAG query: {str(e)}"
     
     return {
-        **state,
         "response": response
     }
 
@@ -102,47 +162,81 @@ def route_decision(state: GraphState) -> str:
     else:
         return "rag"
 
+def build_graph():
+    """Build and compile the LangGraph workflow"""
+    # Create the state graph
+    workflow = StateGraph(GraphState)
+    
+    # Add nodes
+    workflow.add_node("decision", decision_node)
+    workflow.add_node("weather", weather_node)
+    workflow.add_node("rag", rag_node)
+    
+    # Add conditional routing from decision node
+    workflow.add_conditional_edges(
+        "decision",
+        route_decision,
+        {
+            "weather": "weather",
+            "rag": "rag"
+        }
+    )
+    
+    # Add edges from processing nodes to end
+    workflow.add_edge("weather", END)
+    workflow.add_edge("rag", END)
+    
+    # Set entry point
+    workflow.set_entry_point("decision")
+    
+    # Compile the graph
+    return workflow.compile()
+
+@lru_cache(maxsize=None)
+def get_compiled_graph():
+    """
+    Return the process-wide compiled graph.
+    The graph holds no engine dependencies, so every engine can share it.
+    """
+    return build_graph()
+
 class LangGraphEngine:
-    def __init__(self, rag_chain, llm, openweather_api_key: str | None = None):
+    def __init__(
+        self,
+        rag_chain,
+        llm,
+        openweather_api_key: str | None = None,
+        reuse_graph: bool = True,
+        cache: CacheBackend | None = None,
+    ):
         self.rag_chain = rag_chain
         self.llm = llm
         self.openweather_api_key = openweather_api_key
+        self.cache = cache
         
-        # Build the graph
-        self.graph = self._build_graph()
-    
-    def _build_graph(self) -> StateGraph:
-        """Build the LangGraph workflow"""
-        # Create the state graph
-        workflow = StateGraph(GraphState)
-        
-        # Add nodes
-        workflow.add_node("decision", decision_node)
-        workflow.add_node("weather", weather_node)
-        workflow.add_node("rag", rag_node)
-        
-        # Add conditional routing from decision node
-        workflow.add_conditional_edges(
-            "decision",
-            route_decision,
-            {
-                "weather": "weather",
-                "rag": "rag"
-            }
+        # Engine-scoped dependencies handed to every node through the run config
+        self.context = EngineContext(
+            rag_chain=rag_chain,
+            llm=llm,
+            openweather_api_key=openweather_api_key or "",
+            answer_cache=cache.namespaced("answers") if cache is not None else None,
+            weather_cache=cache.namespaced("weather") if cache is not None else None,
+            answer_ttl=settings.ANSWER_CACHE_TTL,
         )
+        self.config: RunnableConfig = {"configurable": {ENGINE_CONTEXT_KEY: self.context}}
         
-        # Add edges from processing nodes to end
-        workflow.add_edge("weather", END)
-        workflow.add_edge("rag", END)
-        
-        # Set entry point
-        workflow.set_entry_point("decision")
-        
-        # Compile the graph
-        return workflow.compile()
+        # Build the graph (or reuse the one compiled for this process)
+        self.graph = get_compiled_graph() if reuse_graph else self._build_graph()
+    
+    def _build_graph(self):
+        """Build the LangGraph workflow"""
+        return build_graph()
     
-    def handle(self, query: str) -> str:
-        """Handle a query using the LangGraph workflow"""
+    def handle(self, query: str, context: EngineContext | None = None) -> str:
+        """
+        Handle a query using the LangGraph workflow.
+        `context` replaces the engine's own for this call (e.g. to cache with another TTL).
+        """
         # Initial state
         initial_state: GraphState = {
             "query": query,
@@ -150,12 +244,10 @@ class LangGraphEngine:
             "city": "",
             "weather_data": {},
             "is_weather_query": False,
-            "rag_chain": self.rag_chain,
-            "llm": self.llm,
-            "openweather_api_key": self.openweather_api_key or ""
         }
         
         # Run the graph
-        result = self.graph.invoke(initial_state)
+        config = self.config if context is None else {"configurable": {ENGINE_CONTEXT_KEY: context}}
+        result = self.graph.invoke(initial_state, config=config)
         
         return result["response"]
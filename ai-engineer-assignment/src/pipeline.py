@@ -0,0 +1,100 @@
+"""Process-wide pipeline construction.
+
+The engine is built and warmed up once per process. `python -m src.serve`
+calls `get_pipeline()` before Streamlit starts listening, so the app's
+first session finds a warm pipeline instead of building it.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from pypdf.errors import EmptyFileError
+from src.cache import get_cache
+from src.config import settings
+from src.data_loader import load_and_split_pdf
+from src.embeddings import get_embeddings
+from src.langgraph_engine import LangGraphEngine
+from src.llm_wrappers import get_llm
+from src.rag_chain import build_rag_chain
+from src.sharded_vectorstore import build_sharded_faiss, is_sharded_index, load_sharded_faiss
+from src.vectorstore import build_faiss_from_docs, load_faiss
+from src.warmup import warm_up
+
+logger = logging.getLogger(__name__)
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+@dataclass
+class Pipeline:
+    engine: LangGraphEngine
+    embeddings: Any
+    vectorstore: Any
+    # Problems loading the PDF, shown to users by the app
+    errors: list[str] = field(default_factory=list)
+
+
+def build_pipeline() -> Pipeline:
+    """
+    Build the engine, loading the FAISS index or creating it from PDF_PATH.
+    """
+    errors: list[str] = []
+    cache = get_cache()
+    embeddings = get_embeddings(cache=cache)
+    persist_path = settings.FAISS_INDEX_PATH
+
+    if is_sharded_index(persist_path):
+        vectorstore = load_sharded_faiss(persist_path, embeddings, max_workers=settings.FAISS_SEARCH_WORKERS)
+    elif os.path.exists(persist_path):
+        vectorstore = load_faiss(persist_path, embeddings)
+    else:
+        try:
+            docs = load_and_split_pdf(settings.PDF_PATH)
+        except FileNotFoundError as e:
+            errors.append(f"PDF not found: {e}")
+            docs = []
+        except EmptyFileError as e:
+            errors.append(f"PDF is empty or unreadable: {e}")
+            docs = []
+
+        if not docs:
+            vectorstore = None
+        elif settings.FAISS_NUM_SHARDS > 1:
+            vectorstore = build_sharded_faiss(
+                docs,
+                embeddings,
+                num_shards=settings.FAISS_NUM_SHARDS,
+                persist_path=persist_path,
+                max_workers=settings.FAISS_SEARCH_WORKERS,
+                compact_docstore=settings.FAISS_COMPACT_DOCSTORE,
+            )
+        else:
+            vectorstore = build_faiss_from_docs(
+                docs, embeddings, persist_path=persist_path, compact_docstore=settings.FAISS_COMPACT_DOCSTORE
+            )
+
+    llm = get_llm()
+    rag = build_rag_chain(llm, vectorstore)
+    engine = LangGraphEngine(rag_chain=rag, llm=llm, openweather_api_key=settings.OPENWEATHER_API_KEY, cache=cache)
+    return Pipeline(engine=engine, embeddings=embeddings, vectorstore=vectorstore, errors=errors)
+
+
+def get_pipeline() -> Pipeline:
+    """
+    Return the process-wide pipeline, building (and warming it up, if
+    WARMUP_ENABLED) on first use.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            pipeline = build_pipeline()
+            for error in pipeline.errors:
+                logger.warning(error)
+            if settings.WARMUP_ENABLED:
+                warm_up(pipeline.engine, embeddings=pipeline.embeddings, vectorstore=pipeline.vectorstore)
+            _pipeline = pipeline
+    return _pipeline
@@ -0,0 +1,31 @@
+"""Production entrypoint: warm up first, then start serving.
+
+`python -m src.serve [streamlit options]` builds and warms the pipeline in
+this process and only then starts Streamlit on `src/app.py`, in the same
+process. The port (and Streamlit's `/_stcore/health` check) only comes up
+once warm-up is done, so nginx or an orchestrator readiness probe never
+routes users to a cold replica.
+"""
+
+import logging
+import os
+import sys
+
+from src.pipeline import get_pipeline
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO)
+    get_pipeline()
+
+    # Imported late so warm-up failures surface before the server starts
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", APP_PATH, *sys.argv[1:]]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import heapq
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.vectorstores import FAISS
+from langchain.vectorstores.base import VectorStore
+from langchain.vectorstores.utils import maximal_marginal_relevance
+from langchain.schema import Document
+from langchain.embeddings.base import Embeddings
+from src.docstore import CompactDocstore
+from src.vectorstore import build_faiss_from_docs, load_faiss, save_faiss
+
+MANIFEST_FILE = "shards.json"
+
+
+def shard_dir_name(shard_id: int) -> str:
+    return f"shard-{shard_id:03d}"
+
+
+def partition_docs(docs: list[Document], num_shards: int) -> list[list[Document]]:
+    """
+    Split docs round-robin into at most `num_shards` non-empty partitions.
+    """
+    num_shards = max(1, min(num_shards, len(docs)))
+    return [docs[i::num_shards] for i in range(num_shards)]
+
+
+class ShardedFAISS(VectorStore):
+    """
+    Vector store that spreads chunks over several FAISS indexes.
+
+    Queries are embedded once, searched on every shard in parallel (FAISS
+    releases the GIL, so threads use all cores) and the per-shard top-k
+    lists are merged with a heap. For MMR each shard returns its `fetch_k`
+    best candidates with their vectors, and MMR runs once on the merged set.
+    """
+
+    def __init__(self, shards: list[FAISS], embeddings: Embeddings, max_workers: int | None = None):
+        if not shards:
+            raise ValueError("ShardedFAISS needs at least one shard")
+        self.shards = shards
+        self._embeddings = embeddings
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(shards), thread_name_prefix="faiss-shard"
+        )
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embeddings
+
+    def close(self) -> None:
+        """Shut down the search thread pool. The store cannot be searched afterwards."""
+        self._executor.shutdown(wait=True)
+
+    def __del__(self) -> None:
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _higher_is_better(self) -> bool:
+        # Euclidean distances rank ascending, inner products descending
+        return getattr(self.shards[0], "distance_strategy", None) == "MAX_INNER_PRODUCT"
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # All shards are built with the same embeddings and distance strategy
+        return self.shards[0]._select_relevance_score_fn()
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        futures = [
+            self._executor.submit(shard.similarity_search_with_score_by_vector, embedding, k, **kwargs)
+            for shard in self.shards
+        ]
+        # Each shard returns its hits already sorted, so a k-way heap merge is enough
+        merged = heapq.merge(
+            *(future.result() for future in futures),
+            key=lambda hit: hit[1],
+            reverse=self._higher_is_better(),
+        )
+        return list(islice(merged, k))
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        embedding = self._embeddings.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def max_marginal_relevance_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Any = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        futures = [
+            self._executor.submit(_mmr_candidates, shard, embedding, fetch_k, filter)
+            for shard in self.shards
+        ]
+        # Keep the global top fetch_k, as a single index would hand to MMR
+        candidates = sorted(
+            (hit for future in futures for hit in future.result()),
+            key=lambda hit: hit[1],
+            reverse=self._higher_is_better(),
+        )[:fetch_k]
+        if not candidates:
+            return []
+        selected = maximal_marginal_relevance(
+            np.array([embedding], dtype=np.float32),
+            [vector for _, _, vector in candidates],
+            k=k,
+            lambda_mult=lambda_mult,
+        )
+        return [(candidates[i][0], candidates[i][1]) for i in selected]
+
+    def max_marginal_relevance_search_by_vector(
+        self, embedding: List[float], k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, **kwargs: Any
+    ) -> List[Document]:
+        hits = self.max_marginal_relevance_search_with_score_by_vector(embedding, k, fetch_k, lambda_mult, **kwargs)
+        return [doc for doc, _ in hits]
+
+    def max_marginal_relevance_search(
+        self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, **kwargs: Any
+    ) -> List[Document]:
+        embedding = self._embeddings.embed_query(query)
+        return self.max_marginal_relevance_search_by_vector(embedding, k, fetch_k, lambda_mult, **kwargs)
+
+    def add_texts(
+        self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any
+    ) -> List[str]:
+        """
+        Add texts round-robin across shards, continuing from the current total.
+        Shards backed by a CompactDocstore are read-only and cannot take new texts.
+        """
+        if any(isinstance(shard.docstore, CompactDocstore) for shard in self.shards):
+            raise NotImplementedError(
+                "Compact docstore shards are read-only; rebuild the index to add texts"
+            )
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        start = sum(shard.index.ntotal for shard in self.shards)
+        slots = [(start + i) % len(self.shards) for i in range(len(texts))]
+
+        def add_to_shard(shard_id: int) -> List[str]:
+            picked = [i for i, slot in enumerate(slots) if slot == shard_id]
+            if not picked:
+                return []
+            return self.shards[shard_id].add_texts(
+                [texts[i] for i in picked], [metadatas[i] for i in picked], **kwargs
+            )
+
+        shard_ids = list(self._executor.map(add_to_shard, range(len(self.shards))))
+        # Restore the caller's ordering
+        iters = [iter(ids) for ids in shard_ids]
+        return [next(iters[slot]) for slot in slots]
+
+    def save_local(self, persist_path: str) -> None:
+        """
+        Save every shard to its own directory plus a manifest listing them.
+        """
+        os.makedirs(persist_path, exist_ok=True)
+        names = [shard_dir_name(i) for i in range(len(self.shards))]
+        list(
+            self._executor.map(
+                lambda pair: save_faiss(pair[0], os.path.join(persist_path, pair[1])),
+                zip(self.shards, names),
+            )
+        )
+        write_manifest(persist_path, names)
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        num_shards: int = 2,
+        **kwargs: Any,
+    ) -> "ShardedFAISS":
+        metadatas = metadatas or [{} for _ in texts]
+        docs = [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
+        return build_sharded_faiss(docs, embedding, num_shards=num_shards, **kwargs)
+
+
+def _mmr_candidates(
+    shard: FAISS, embedding: List[float], fetch_k: int, filter: Any = None
+) -> List[Tuple[Document, float, np.ndarray]]:
+    """
+    Return a shard's `fetch_k` nearest chunks as (doc, score, vector), best first.
+    Mirrors FAISS's own MMR search, which also fetches twice as many when filtering.
+    """
+    scores, indices = shard.index.search(
+        np.array([embedding], dtype=np.float32), fetch_k if filter is None else fetch_k * 2
+    )
+    filter_func = shard._create_filter_func(filter) if filter is not None else None
+    candidates = []
+    for score, i in zip(scores[0], indices[0]):
+        if i == -1:
+            # Fewer than fetch_k chunks in this shard
+            continue
+        doc = shard.docstore.search(shard.index_to_docstore_id[i])
+        if filter_func is not None and not filter_func(doc.metadata):
+            continue
+        candidates.append((doc, float(score), shard.index.reconstruct(int(i))))
+    return candidates[:fetch_k]
+
+
+def write_manifest(persist_path: str, shard_names: list[str]) -> None:
+    with open(os.path.join(persist_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"shards": shard_names}, f)
+
+
+def is_sharded_index(persist_path: str) -> bool:
+    return os.path.exists(os.path.join(persist_path, MANIFEST_FILE))
+
+
+def build_sharded_faiss(
+    docs: list[Document],
+    embeddings: Embeddings,
+    num_shards: int,
+    persist_path: str | None = None,
+    max_workers: int | None = None,
+    compact_docstore: bool = False,
+) -> ShardedFAISS:
+    """
+    Partition docs across `num_shards` FAISS indexes and build them in parallel.
+    If persist_path is provided, each shard is saved to its own subdirectory.
+    """
+    partitions = partition_docs(docs, num_shards)
+    if persist_path:
+        os.makedirs(persist_path, exist_ok=True)
+
+    def build(shard_id: int) -> FAISS:
+        shard_path = os.path.join(persist_path, shard_dir_name(shard_id)) if persist_path else None
+        return build_faiss_from_docs(
+            partitions[shard_id], embeddings, persist_path=shard_path, compact_docstore=compact_docstore
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(partitions)) as pool:
+        shards = list(pool.map(build, range(len(partitions))))
+
+    # Written last so a half-built index is never picked up as complete
+    if persist_path:
+        write_manifest(persist_path, [shard_dir_name(i) for i in range(len(shards))])
+    return ShardedFAISS(shards, embeddings, max_workers=max_workers)
+
+
+def load_sharded_faiss(persist_path: str, embeddings: Embeddings, max_workers: int | None = None) -> ShardedFAISS:
+    """
+    Load every shard listed in the manifest, in parallel.
+    """
+    with open(os.path.join(persist_path, MANIFEST_FILE), encoding="utf-8") as f:
+        names = json.load(f)["shards"]
+    paths = [os.path.join(persist_path, name) for name in names]
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(paths)) as pool:
+        shards = list(pool.map(lambda path: load_faiss(path, embeddings), paths))
+    return ShardedFAISS(shards, embeddings, max_workers=max_workers)
@@ -1,22 +1,80 @@
 from langchain.vectorstores import FAISS
 from langchain.schema import Document
 from langchain.embeddings.base import Embeddings
+from src.docstore import CompactDocstore, PositionalIds, is_compact_docstore
+import faiss
+import numpy as np
 import os
 
-def build_faiss_from_docs(docs: list[Document], embeddings: Embeddings, persist_path: str | None = None) -> FAISS:
+INDEX_FILE = "index.faiss"
+
+def build_faiss_from_docs(
+    docs: list[Document],
+    embeddings: Embeddings,
+    persist_path: str | None = None,
+    compact_docstore: bool = False,
+) -> FAISS:
     """
     Build and return FAISS index from docs.
     If persist_path is provided, save local files there.
+    With compact_docstore, chunks are stored in a memory-mapped CompactDocstore
+    instead of a pickled InMemoryDocstore (requires persist_path).
     """
+    if compact_docstore:
+        if not persist_path:
+            raise ValueError("compact_docstore requires a persist_path to memory-map from")
+        return build_compact_faiss(docs, embeddings, persist_path)
     vectorstore = FAISS.from_documents(docs, embeddings)
     if persist_path:
         os.makedirs(persist_path, exist_ok=True)
         vectorstore.save_local(persist_path)
     return vectorstore
 
+def build_compact_faiss(docs: list[Document], embeddings: Embeddings, persist_path: str) -> FAISS:
+    """
+    Embed docs into a flat L2 index (same as FAISS.from_documents) and write
+    the chunks in the compact layout, then load it back memory-mapped.
+    """
+    vectors = np.asarray(embeddings.embed_documents([doc.page_content for doc in docs]), dtype=np.float32)
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+
+    os.makedirs(persist_path, exist_ok=True)
+    faiss.write_index(index, os.path.join(persist_path, INDEX_FILE))
+    CompactDocstore.write(persist_path, docs)
+    return load_compact_faiss(persist_path, embeddings)
+
+def load_compact_faiss(persist_path: str, embeddings: Embeddings) -> FAISS:
+    """
+    Load an index saved by build_compact_faiss. Chunk texts stay on disk and
+    Documents are only created for search hits.
+    """
+    index = faiss.read_index(os.path.join(persist_path, INDEX_FILE))
+    docstore = CompactDocstore.load(persist_path)
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=PositionalIds(len(docstore)),
+    )
+
+def save_faiss(vectorstore: FAISS, persist_path: str) -> None:
+    """
+    Save a FAISS store, including ones backed by a CompactDocstore
+    (which FAISS.save_local cannot pickle).
+    """
+    os.makedirs(persist_path, exist_ok=True)
+    if isinstance(vectorstore.docstore, CompactDocstore):
+        faiss.write_index(vectorstore.index, os.path.join(persist_path, INDEX_FILE))
+        vectorstore.docstore.save(persist_path)
+    else:
+        vectorstore.save_local(persist_path)
+
 def load_faiss(persist_path: str, embeddings: Embeddings) -> FAISS:
     """
     Load a previously saved FAISS index.
     """
+    if is_compact_docstore(persist_path):
+        return load_compact_faiss(persist_path, embeddings)
     # LangChain >=0.1 may require explicit allow_dangerous_deserialization
     return FAISS.load_local(persist_path, embeddings, allow_dangerous_deserialization=True)
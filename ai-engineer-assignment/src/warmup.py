@@ -0,0 +1,219 @@
+"""Warm-up after a deploy and index-time question generation.
+
+`warm_up` runs once the engine is built (see `src.pipeline`): it runs the
+embedding model, pulls the index into the page cache and sends canonical
+queries through the engine so their answers land in the cache.
+
+`python -m src.warmup` is the offline job: it asks the LLM for likely
+questions per chunk, saves them to WARMUP_QUESTIONS_PATH and, when a
+shared cache backend is configured, pre-populates their answers with
+WARMUP_ANSWER_TTL. At startup only the generated questions whose answer
+is still cached are replayed, so they never turn into live LLM calls.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import replace
+from typing import Any, Iterable
+
+from langchain.schema import Document
+from src.cache import CacheBackend, is_shared_cache
+from src.config import settings
+from src.docstore import CompactDocstore
+from src.embeddings import CachedEmbeddings
+from src.langgraph_engine import answer_cache_key
+
+logger = logging.getLogger(__name__)
+
+QUESTION_PROMPT = (
+    "Write {n} short questions a user might ask that are answered by the following passage. "
+    "Return one question per line, without numbering.\n\n{text}"
+)
+
+# Strips list markers such as "1.", "2)", "-" or "*" from generated lines
+_LIST_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+
+def load_warmup_queries(
+    path: str | None = None,
+    include_generated: bool = True,
+    limit: int | None = None,
+    answer_cache: CacheBackend | None = None,
+) -> list[str]:
+    """
+    Return the configured canonical queries, then any saved generated
+    questions, capped at `limit` (WARMUP_MAX_QUERIES by default).
+    With `answer_cache`, generated questions whose answer is not cached
+    (expired or never pre-populated) are left out.
+    """
+    path = path or settings.WARMUP_QUESTIONS_PATH
+    limit = settings.WARMUP_MAX_QUERIES if limit is None else limit
+    queries = list(settings.WARMUP_QUERIES)
+    if include_generated and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            generated = json.load(f)
+        if answer_cache is not None:
+            generated = [q for q in generated if answer_cache.get(answer_cache_key(q)) is not None]
+        queries.extend(generated)
+    return list(dict.fromkeys(queries))[:limit]
+
+
+def touch_index_pages(vectorstore: Any) -> int:
+    """
+    Pull memory-mapped index files into the page cache. Returns bytes touched.
+    """
+    touched = 0
+    for shard in getattr(vectorstore, "shards", [vectorstore]):
+        docstore = getattr(shard, "docstore", None)
+        if isinstance(docstore, CompactDocstore):
+            touched += docstore.touch()
+    return touched
+
+
+def warm_up(engine: Any, embeddings: Any = None, vectorstore: Any = None, queries: Iterable[str] | None = None) -> dict:
+    """
+    Warm the pipeline so the first real users see steady-state latency.
+    Failed queries are logged and skipped. Returns the seconds spent per stage.
+
+    Generated questions are only replayed when the engine has a shared
+    (disk/Redis) cache, and only those whose answer the offline job left in
+    it. Anything else would be a live LLM call on every restart.
+    """
+    timings: dict = {}
+
+    start = time.perf_counter()
+    if embeddings is not None:
+        # Go past the cache so the model itself runs once
+        if isinstance(embeddings, CachedEmbeddings):
+            embeddings = embeddings.embeddings
+        embeddings.embed_query("warm up")
+    timings["embeddings"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if vectorstore is not None:
+        touch_index_pages(vectorstore)
+        vectorstore.similarity_search("warm up", k=1)
+    timings["index"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if queries is None:
+        answer_cache = getattr(getattr(engine, "context", None), "answer_cache", None)
+        queries = load_warmup_queries(include_generated=is_shared_cache(answer_cache), answer_cache=answer_cache)
+    else:
+        queries = list(queries)[: settings.WARMUP_MAX_QUERIES]
+    for query in queries:
+        try:
+            engine.handle(query)
+        except Exception as e:
+            logger.warning("Warm-up query %r failed: %s", query, e)
+    timings["queries"] = time.perf_counter() - start
+
+    logger.info("Warm-up finished (%d queries): %s", len(queries), timings)
+    return timings
+
+
+def parse_questions(text: str) -> list[str]:
+    """Split an LLM reply into clean, non-empty question lines"""
+    lines = (_LIST_MARKER.sub("", line).strip() for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+def generate_questions(docs: list[Document], llm: Any, per_chunk: int | None = None) -> list[str]:
+    """
+    Ask the LLM for likely user questions about each chunk. Duplicates are dropped.
+    """
+    per_chunk = per_chunk or settings.WARMUP_QUESTIONS_PER_CHUNK
+    questions: list[str] = []
+    for doc in docs:
+        prompt = QUESTION_PROMPT.format(n=per_chunk, text=doc.page_content)
+        try:
+            reply = llm.invoke(prompt)
+        except Exception as e:
+            logger.warning("Question generation failed for a chunk: %s", e)
+            continue
+        # Chat models return a message, plain LLMs a string
+        questions.extend(parse_questions(getattr(reply, "content", reply))[:per_chunk])
+    return list(dict.fromkeys(questions))
+
+
+def save_questions(questions: list[str], path: str | None = None) -> None:
+    path = path or settings.WARMUP_QUESTIONS_PATH
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(questions, f, indent=2)
+
+
+def prepopulate_answers(engine: Any, questions: Iterable[str]) -> int:
+    """
+    Answer each question through the engine so the answers are cached.
+    They are stored with WARMUP_ANSWER_TTL instead of ANSWER_CACHE_TTL,
+    so they are still cached when replicas warm up from them later.
+    Returns the number of questions answered.
+    """
+    if getattr(engine, "cache", None) is None:
+        raise ValueError("prepopulate_answers needs an engine with a cache backend")
+    context = replace(engine.context, answer_ttl=settings.WARMUP_ANSWER_TTL)
+    answered = 0
+    for question in questions:
+        try:
+            engine.handle(question, context=context)
+            answered += 1
+        except Exception as e:
+            logger.warning("Could not pre-populate answer for %r: %s", question, e)
+    return answered
+
+
+def main() -> int:
+    """Offline job: generate questions for the configured PDF and cache their answers."""
+    from src.cache import get_cache
+    from src.data_loader import load_and_split_pdf
+    from src.embeddings import get_embeddings
+    from src.langgraph_engine import LangGraphEngine
+    from src.llm_wrappers import get_llm
+    from src.rag_chain import build_rag_chain
+    from src.sharded_vectorstore import is_sharded_index, load_sharded_faiss
+    from src.vectorstore import load_faiss
+
+    logging.basicConfig(level=logging.INFO)
+    docs = load_and_split_pdf(settings.PDF_PATH)
+    llm = get_llm()
+    questions = generate_questions(docs, llm)
+    save_questions(questions)
+    logger.info("Saved %d questions to %s", len(questions), settings.WARMUP_QUESTIONS_PATH)
+
+    cache = get_cache()
+    if not is_shared_cache(cache):
+        # Answers cached here would die with this job, and the app only replays
+        # generated questions whose answers sit in a shared cache
+        logger.warning(
+            "No shared cache (CACHE_BACKEND=%s): answers are not pre-populated and the app "
+            "does not read %s at startup. Set CACHE_BACKEND to disk or redis to warm up from it.",
+            settings.CACHE_BACKEND,
+            settings.WARMUP_QUESTIONS_PATH,
+        )
+        return 0
+
+    embeddings = get_embeddings(cache=cache)
+    persist_path = settings.FAISS_INDEX_PATH
+    if is_sharded_index(persist_path):
+        vectorstore = load_sharded_faiss(persist_path, embeddings, max_workers=settings.FAISS_SEARCH_WORKERS)
+    else:
+        vectorstore = load_faiss(persist_path, embeddings)
+    engine = LangGraphEngine(
+        rag_chain=build_rag_chain(llm, vectorstore),
+        llm=llm,
+        openweather_api_key=settings.OPENWEATHER_API_KEY,
+        cache=cache,
+    )
+    answered = prepopulate_answers(engine, questions)
+    logger.info("Pre-populated %d answers", answered)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
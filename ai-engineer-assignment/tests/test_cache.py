@@ -0,0 +1,231 @@
+import threading
+import time
+
+import pytest
+
+from src.cache import DiskCache, InMemoryCache, RedisCache, make_key
+
+
+def test_in_memory_cache_lru_eviction():
+    cache = InMemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "a" is now most recently used
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_in_memory_cache_ttl_expiry():
+    cache = InMemoryCache()
+    cache.set("k", "v", ttl=0.01)
+    assert cache.get("k") == "v"
+    time.sleep(0.02)
+    assert cache.get("k", default="gone") == "gone"
+
+
+def test_namespaces_share_storage_but_not_keys():
+    cache = InMemoryCache(namespace="app")
+    answers = cache.namespaced("answers")
+    weather = cache.namespaced("weather")
+    answers.set("k", "answer")
+    weather.set("k", "weather")
+    assert answers.get("k") == "answer"
+    assert weather.get("k") == "weather"
+    assert cache.get("k") is None
+    assert len(cache) == 2
+
+
+def test_get_or_set_only_computes_once_under_contention():
+    cache = InMemoryCache()
+    calls = []
+
+    def slow_factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_set("k", slow_factory)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_get_or_set_fills_different_keys_in_parallel():
+    cache = InMemoryCache()
+
+    def slow_factory():
+        time.sleep(0.3)
+        return "value"
+
+    threads = [
+        threading.Thread(target=cache.get_or_set, args=(f"key-{i}", slow_factory))
+        for i in range(4)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    # Serialized fills would take 1.2s
+    assert elapsed < 0.6
+    assert all(cache.get(f"key-{i}") == "value" for i in range(4))
+    assert cache._inflight == {}
+
+
+def test_get_or_set_does_not_cache_failures():
+    cache = InMemoryCache()
+
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_set("k", failing)
+    assert cache.get_or_set("k", lambda: "ok") == "ok"
+
+
+def test_disk_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path, namespace="app").set(make_key("What is RAG?"), {"answer": 42})
+    reopened = DiskCache(path, namespace="app")
+    assert reopened.get(make_key("What is RAG?")) == {"answer": 42}
+    assert DiskCache(path, namespace="other").get(make_key("What is RAG?")) is None
+
+
+def test_disk_cache_ttl_expiry(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("k", "v", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("k") is None
+
+
+def test_disk_cache_waits_for_other_process(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    # Separate instances share nothing in memory, like two worker processes
+    caches = [DiskCache(path, namespace="app", poll_interval=0.01) for _ in range(4)]
+    calls = []
+
+    def slow_factory():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda c=c: results.append(c.get_or_set("k", slow_factory)))
+        for c in caches
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+    assert caches[0]._connection().execute("SELECT COUNT(*) FROM locks").fetchone() == (0,)
+
+
+def test_disk_cache_purges_expired_rows_on_set(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), purge_interval=0)
+    for i in range(5):
+        cache.set(f"old-{i}", "v", ttl=0.01)
+    time.sleep(0.02)
+    cache.set("new", "v")
+
+    keys = [row[0] for row in cache._connection().execute("SELECT key FROM cache")]
+    assert keys == ["new"]
+
+
+def test_redis_cache_round_trip_and_ttl():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    cache = RedisCache(client=client, namespace="app")
+    cache.set("k", [0.1, 0.2], ttl=60)
+    assert cache.get("k") == [0.1, 0.2]
+    assert 0 < client.pttl("app:k") <= 60_000
+    cache.delete("k")
+    assert cache.get("k") is None
+
+
+def test_redis_cache_waits_for_other_replica():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    # Two replicas talking to the same server
+    replica_a = RedisCache(client=fakeredis.FakeRedis(server=server), namespace="app", poll_interval=0.01)
+    replica_b = RedisCache(client=fakeredis.FakeRedis(server=server), namespace="app", poll_interval=0.01)
+    calls = []
+
+    def slow_factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda c=c: results.append(c.get_or_set("k", slow_factory)))
+        for c in (replica_a, replica_b)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["value", "value"]
+    assert len(calls) == 1
+
+
+def test_disk_cache_stores_json_not_pickle(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path)
+    cache.set("k", {"answer": "42", "vector": [0.5, 1.0]})
+    raw = sqlite3.connect(path).execute("SELECT value FROM cache").fetchone()[0]
+    assert raw == b'{"answer": "42", "vector": [0.5, 1.0]}'
+    with pytest.raises(TypeError):
+        cache.set("obj", object())
+
+
+def test_redis_cache_keeps_lock_taken_by_other_replica():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    cache = RedisCache(client=client, namespace="app", lock_timeout=0.05, poll_interval=0.01)
+
+    def slow_factory():
+        # Our lock expires meanwhile and another replica takes it
+        time.sleep(0.1)
+        client.set("lock:app:k", "other-replica")
+        return "value"
+
+    assert cache.get_or_set("k", slow_factory) == "value"
+    assert client.get("lock:app:k") == b"other-replica"
+
+
+def test_cached_embeddings_only_caches_queries():
+    from unittest.mock import Mock
+
+    from src.embeddings import CachedEmbeddings
+
+    model = Mock()
+    model.embed_query.return_value = [0.1, 0.2]
+    model.embed_documents.return_value = [[0.3], [0.4]]
+    cache = InMemoryCache()
+    embeddings = CachedEmbeddings(model, cache, ttl=60)
+
+    assert embeddings.embed_query("hello") == [0.1, 0.2]
+    assert embeddings.embed_query("hello") == [0.1, 0.2]
+    model.embed_query.assert_called_once()
+
+    assert embeddings.embed_documents(["a", "b"]) == [[0.3], [0.4]]
+    assert len(cache) == 1
@@ -0,0 +1,62 @@
+from langchain.schema import Document
+from src.docstore import CompactDocstore, PositionalIds, is_compact_docstore
+
+
+def _docs():
+    return [
+        Document(page_content="First chunk", metadata={"source": "a.pdf", "page": 0}),
+        Document(page_content="Ünïcödé chunk ✓", metadata={"source": "b.pdf", "page": 3}),
+        Document(page_content="", metadata={"source": "a.pdf"}),
+        Document(page_content="No metadata"),
+    ]
+
+
+def test_compact_docstore_round_trip(tmp_path):
+    CompactDocstore.write(str(tmp_path), _docs())
+    assert is_compact_docstore(str(tmp_path))
+
+    store = CompactDocstore.load(str(tmp_path))
+    assert len(store) == 4
+    # Repeated sources are stored once
+    assert store.sources == ["a.pdf", "b.pdf"]
+
+    for i, expected in enumerate(_docs()):
+        doc = store.search(i)
+        assert doc.page_content == expected.page_content
+        assert doc.metadata == expected.metadata
+
+
+def test_compact_docstore_missing_ids(tmp_path):
+    CompactDocstore.write(str(tmp_path), _docs())
+    store = CompactDocstore.load(str(tmp_path))
+    assert store.search(4) == "ID 4 not found."
+    assert store.search("not-an-id") == "ID not-an-id not found."
+    assert store.search("1").page_content == "Ünïcödé chunk ✓"
+
+
+def test_compact_docstore_empty(tmp_path):
+    CompactDocstore.write(str(tmp_path), [])
+    store = CompactDocstore.load(str(tmp_path))
+    assert len(store) == 0
+    assert store.search(0) == "ID 0 not found."
+
+
+def test_positional_ids():
+    ids = PositionalIds(3)
+    assert ids[2] == 2
+    assert list(ids) == [0, 1, 2]
+    assert len(ids) == 3
+    assert 3 not in ids
+
+
+def test_compact_docstore_save_copies_files(tmp_path):
+    CompactDocstore.write(str(tmp_path / "a"), _docs())
+    store = CompactDocstore.load(str(tmp_path / "a"))
+    store.save(str(tmp_path / "b"))
+    # In place is a no-op rather than rewriting the mapped files
+    store.save(str(tmp_path / "a"))
+
+    for path in ("a", "b"):
+        copy = CompactDocstore.load(str(tmp_path / path))
+        assert [copy.search(i).page_content for i in range(4)] == [d.page_content for d in _docs()]
+        assert copy.search(1).metadata == {"source": "b.pdf", "page": 3}
@@ -38,7 +38,7 @@ def test_rag_query_detection():
 
 
 def test_state_structure():
-    """Ensure GraphState structure matches expected keys"""
+    """Ensure GraphState only carries per-request keys"""
     from src.langgraph_engine import GraphState
 
     mock_state: GraphState = {
@@ -47,9 +47,6 @@ def test_state_structure():
         "city": "",
         "weather_data": {},
         "is_weather_query": False,
-        "rag_chain": None,
-        "llm": None,
-        "openweather_api_key": "",
     }
 
     expected_keys = {
@@ -58,8 +55,77 @@ def test_state_structure():
         "city",
         "weather_data",
         "is_weather_query",
-        "rag_chain",
-        "llm",
-        "openweather_api_key",
     }
     assert set(mock_state.keys()) == expected_keys
+    assert set(GraphState.__annotations__) == expected_keys
+
+
+def test_nodes_return_partial_updates(mock_rag_chain):
+    """Nodes read dependencies from the config and only return changed keys"""
+    from src.langgraph_engine import EngineContext, decision_node, rag_node
+
+    state = {
+        "query": "What is RAG?",
+        "response": "",
+        "city": "",
+        "weather_data": {},
+        "is_weather_query": False,
+    }
+    config = {"configurable": {"engine": EngineContext(rag_chain=mock_rag_chain)}}
+
+    assert decision_node(state) == {"is_weather_query": False, "city": ""}
+    assert rag_node(state, config) == {"response": "Mocked RAG response"}
+    mock_rag_chain.run.assert_called_once_with("What is RAG?")
+
+
+def test_engine_reuses_compiled_graph(mock_rag_chain, mock_llm):
+    """Engines share one compiled graph per process unless asked not to"""
+    from src.langgraph_engine import LangGraphEngine
+
+    first = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm)
+    second = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm)
+    isolated = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm, reuse_graph=False)
+
+    assert first.graph is second.graph
+    assert isolated.graph is not first.graph
+    assert first.handle("Summarize the PDF") == "Mocked RAG response"
+
+
+def test_engine_context_not_copied_into_run_metadata(mock_rag_chain, mock_llm):
+    """No engine dependency (e.g. the OpenWeather key) reaches run metadata or traces"""
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.runnables.config import ensure_config
+    from src.langgraph_engine import LangGraphEngine
+
+    class MetadataRecorder(BaseCallbackHandler):
+        def __init__(self):
+            self.metadata = []
+
+        def on_chain_start(self, serialized, inputs, *, metadata=None, **kwargs):
+            self.metadata.append(metadata or {})
+
+    engine = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm, openweather_api_key="secret-key")
+    assert "secret-key" not in repr(engine.context)
+
+    metadata = ensure_config(engine.config)["metadata"]
+    assert not any(isinstance(v, str) for v in metadata.values())
+
+    recorder = MetadataRecorder()
+    state = {"query": "What is RAG?", "response": "", "city": "", "weather_data": {}, "is_weather_query": False}
+    engine.graph.invoke(state, config={**engine.config, "callbacks": [recorder]})
+    assert recorder.metadata
+    for run_metadata in recorder.metadata:
+        assert "secret-key" not in run_metadata.values()
+        assert "engine" not in run_metadata
+
+
+def test_engine_caches_rag_answers(mock_rag_chain, mock_llm):
+    """Repeated queries are answered from the shared cache"""
+    from src.cache import InMemoryCache
+    from src.langgraph_engine import LangGraphEngine
+
+    engine = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm, cache=InMemoryCache())
+
+    assert engine.handle("What is RAG?") == "Mocked RAG response"
+    assert engine.handle("  what is   RAG? ") == "Mocked RAG response"
+    mock_rag_chain.run.assert_called_once()
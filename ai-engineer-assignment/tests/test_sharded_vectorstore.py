@@ -0,0 +1,111 @@
+import os
+
+import pytest
+from langchain.schema import Document
+from src.embeddings import get_embeddings
+from src.vectorstore import build_faiss_from_docs
+from src.sharded_vectorstore import (
+    build_sharded_faiss,
+    is_sharded_index,
+    load_sharded_faiss,
+    partition_docs,
+)
+
+
+def _docs():
+    texts = ["hello world", "another document", "python programming", "weather in london", "faiss shards"]
+    return [Document(page_content=t, metadata={"source": f"t{i}"}) for i, t in enumerate(texts)]
+
+
+def test_partition_docs_round_robin():
+    docs = _docs()
+    parts = partition_docs(docs, 2)
+    assert [len(p) for p in parts] == [3, 2]
+    assert partition_docs(docs[:1], 4) == [docs[:1]]
+
+
+def test_sharded_search_matches_single_index(tmp_path):
+    embeddings = get_embeddings()
+    path = str(tmp_path / "index")
+    vs = build_sharded_faiss(_docs(), embeddings, num_shards=3, persist_path=path)
+    single = build_faiss_from_docs(_docs(), embeddings)
+
+    assert len(vs.shards) == 3
+    assert is_sharded_index(path)
+    assert sorted(os.listdir(path)) == ["shard-000", "shard-001", "shard-002", "shards.json"]
+
+    for query in ("hello", "python", "weather forecast"):
+        hits = vs.similarity_search_with_score(query, k=3)
+        expected = single.similarity_search_with_score(query, k=3)
+        # The heap merge of per-shard top-k must equal the global top-k
+        assert [doc.page_content for doc, _ in hits] == [doc.page_content for doc, _ in expected]
+        assert [score for _, score in hits] == pytest.approx([score for _, score in expected], rel=1e-5)
+    vs.close()
+
+
+def test_load_sharded_faiss_and_add_texts(tmp_path):
+    embeddings = get_embeddings()
+    path = str(tmp_path / "index")
+    build_sharded_faiss(_docs(), embeddings, num_shards=2, persist_path=path)
+
+    vs = load_sharded_faiss(path, embeddings)
+    ids = vs.add_texts(["new chunk about shards"], [{"source": "t5"}])
+    assert len(ids) == 1
+    assert sum(shard.index.ntotal for shard in vs.shards) == 6
+    assert vs.similarity_search("new chunk about shards", k=1)[0].metadata["source"] == "t5"
+    assert len(vs.as_retriever(search_kwargs={"k": 2}).get_relevant_documents("hello")) == 2
+
+
+def test_sharded_compact_docstore(tmp_path):
+    from src.docstore import CompactDocstore
+
+    embeddings = get_embeddings()
+    path = str(tmp_path / "index")
+    built = build_sharded_faiss(_docs(), embeddings, num_shards=2, persist_path=path, compact_docstore=True)
+    single = build_faiss_from_docs(_docs(), embeddings)
+
+    vs = load_sharded_faiss(path, embeddings)
+    assert all(isinstance(shard.docstore, CompactDocstore) for shard in vs.shards)
+    hits = vs.similarity_search_with_score("hello", k=3)
+    expected = single.similarity_search_with_score("hello", k=3)
+    assert [(d.page_content, d.metadata) for d, _ in hits] == [(d.page_content, d.metadata) for d, _ in expected]
+
+    # Saving copies the compact files; saving in place leaves the mapped files intact
+    copy_path = str(tmp_path / "copy")
+    vs.save_local(copy_path)
+    vs.save_local(path)
+    copied = load_sharded_faiss(copy_path, embeddings)
+    assert [d.page_content for d in copied.similarity_search("hello", k=3)] == [d.page_content for d, _ in hits]
+    assert [d.page_content for d in vs.similarity_search("hello", k=3)] == [d.page_content for d, _ in hits]
+
+    with pytest.raises(NotImplementedError):
+        vs.add_texts(["new chunk"])
+
+    for store in (built, vs, copied):
+        store.close()
+
+
+def test_sharded_relevance_scores_and_mmr_match_single_index():
+    embeddings = get_embeddings()
+    vs = build_sharded_faiss(_docs(), embeddings, num_shards=2)
+    single = build_faiss_from_docs(_docs(), embeddings)
+
+    hits = vs.similarity_search_with_relevance_scores("hello", k=3)
+    expected = single.similarity_search_with_relevance_scores("hello", k=3)
+    assert [doc.page_content for doc, _ in hits] == [doc.page_content for doc, _ in expected]
+    assert [score for _, score in hits] == pytest.approx([score for _, score in expected], rel=1e-5)
+
+    threshold = expected[1][1]
+    retriever = vs.as_retriever(
+        search_type="similarity_score_threshold", search_kwargs={"k": 3, "score_threshold": threshold}
+    )
+    assert [doc.page_content for doc in retriever.invoke("hello")] == [
+        doc.page_content for doc, _ in expected[:2]
+    ]
+
+    # With fetch_k covering every chunk both stores hand MMR the same candidates
+    mmr = vs.max_marginal_relevance_search("hello", k=3, fetch_k=5, lambda_mult=0.3)
+    expected_mmr = single.max_marginal_relevance_search("hello", k=3, fetch_k=5, lambda_mult=0.3)
+    assert [doc.page_content for doc in mmr] == [doc.page_content for doc in expected_mmr]
+    assert len(vs.as_retriever(search_type="mmr", search_kwargs={"k": 2}).invoke("hello")) == 2
+    vs.close()
@@ -10,3 +10,20 @@ def test_build_faiss(tmp_path):
     # simple check: similarity_search returns results
     hits = vs.similarity_search("hello", k=1)
     assert len(hits) >= 1
+
+def test_build_compact_faiss(tmp_path):
+    from src.docstore import CompactDocstore
+    from src.vectorstore import load_faiss
+
+    docs = [Document(page_content="hello world", metadata={"source":"t1", "page": 0}),
+            Document(page_content="another document", metadata={"source":"t2", "page": 1})]
+    embeddings = get_embeddings()
+    path = str(tmp_path/"index")
+    build_faiss_from_docs(docs, embeddings, persist_path=path, compact_docstore=True)
+
+    # load_faiss detects the compact layout
+    vs = load_faiss(path, embeddings)
+    assert isinstance(vs.docstore, CompactDocstore)
+    hits = vs.similarity_search("hello", k=1)
+    assert hits[0].page_content == "hello world"
+    assert hits[0].metadata == {"source": "t1", "page": 0}
@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+from unittest.mock import Mock, call
+
+import pytest
+from langchain.schema import Document
+from src.cache import DiskCache, InMemoryCache
+from src.config import settings
+from src.docstore import CompactDocstore
+from src.langgraph_engine import LangGraphEngine
+from src.warmup import (
+    generate_questions,
+    load_warmup_queries,
+    parse_questions,
+    prepopulate_answers,
+    save_questions,
+    touch_index_pages,
+    warm_up,
+)
+
+
+def test_parse_questions_strips_list_markers():
+    reply = "1. What is RAG?\n- Why use FAISS?\n\n2) How are chunks split?\n"
+    assert parse_questions(reply) == ["What is RAG?", "Why use FAISS?", "How are chunks split?"]
+
+
+def test_generate_questions_dedupes_and_skips_failures():
+    llm = Mock()
+    llm.invoke.side_effect = [
+        Mock(content="What is RAG?\nWhat is FAISS?\nExtra question?"),
+        RuntimeError("quota"),
+        "What is RAG?",
+    ]
+    docs = [Document(page_content=f"chunk {i}") for i in range(3)]
+    assert generate_questions(docs, llm, per_chunk=2) == ["What is RAG?", "What is FAISS?"]
+
+
+def test_save_and_load_warmup_queries(tmp_path):
+    path = str(tmp_path / "questions.json")
+    save_questions(["What is RAG?", "What is FAISS?"], path)
+    assert json.load(open(path)) == ["What is RAG?", "What is FAISS?"]
+    assert load_warmup_queries(path) == ["What is RAG?", "What is FAISS?"]
+
+
+def test_warm_up_runs_every_stage():
+    engine = Mock()
+    engine.handle.side_effect = ["ok", RuntimeError("boom"), "ok"]
+    embeddings = Mock()
+    vectorstore = Mock(spec=["similarity_search"])
+
+    timings = warm_up(engine, embeddings=embeddings, vectorstore=vectorstore, queries=["a", "b", "c"])
+
+    assert set(timings) == {"embeddings", "index", "queries"}
+    embeddings.embed_query.assert_called_once()
+    vectorstore.similarity_search.assert_called_once()
+    assert engine.handle.call_count == 3
+
+
+def test_touch_index_pages_compact_docstore(tmp_path):
+    CompactDocstore.write(str(tmp_path), [Document(page_content="x" * 10000, metadata={"page": 0})])
+    shard = Mock(docstore=CompactDocstore.load(str(tmp_path)))
+    assert touch_index_pages(Mock(shards=[shard, shard])) > 20000
+
+
+def test_prepopulate_answers_fills_cache(mock_rag_chain, mock_llm, monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_TTL", 0.01)
+    engine = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm, cache=InMemoryCache())
+    assert prepopulate_answers(engine, ["What is RAG?", "Summarize the PDF"]) == 2
+
+    # Stored with WARMUP_ANSWER_TTL (never expire), not the live ANSWER_CACHE_TTL
+    time.sleep(0.02)
+    engine.handle("What is RAG?")
+    assert mock_rag_chain.run.call_count == 2
+
+    with pytest.raises(ValueError):
+        prepopulate_answers(LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm), ["q"])
+
+
+def test_warm_up_caps_queries_and_needs_shared_cache_for_generated(tmp_path, monkeypatch, mock_rag_chain, mock_llm):
+    path = str(tmp_path / "questions.json")
+    questions = [f"generated {i}" for i in range(10)]
+    save_questions(questions, path)
+    monkeypatch.setattr(settings, "WARMUP_QUESTIONS_PATH", path)
+    monkeypatch.setattr(settings, "WARMUP_QUERIES", ["canonical"])
+    monkeypatch.setattr(settings, "WARMUP_MAX_QUERIES", 3)
+
+    # Per-process cache: generated questions would all be live LLM calls
+    local_engine = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm, cache=InMemoryCache())
+    warm_up(local_engine)
+    assert mock_rag_chain.run.call_args_list == [call("canonical")]
+
+    # Shared cache: they were answered offline, replay up to the cap as cache hits
+    shared_engine = LangGraphEngine(
+        rag_chain=mock_rag_chain, llm=mock_llm, cache=DiskCache(str(tmp_path / "cache.sqlite3"))
+    )
+    prepopulate_answers(shared_engine, questions)
+    mock_rag_chain.run.reset_mock()
+    monkeypatch.setattr(shared_engine, "handle", Mock(wraps=shared_engine.handle))
+    warm_up(shared_engine)
+    assert [c.args[0] for c in shared_engine.handle.call_args_list] == ["canonical", "generated 0", "generated 1"]
+    assert mock_rag_chain.run.call_args_list == [call("canonical")]
+
+
+def test_warm_up_skips_generated_questions_whose_answer_expired(tmp_path, monkeypatch, mock_rag_chain, mock_llm):
+    path = str(tmp_path / "questions.json")
+    save_questions(["What is RAG?", "What is FAISS?"], path)
+    monkeypatch.setattr(settings, "WARMUP_QUESTIONS_PATH", path)
+    monkeypatch.setattr(settings, "WARMUP_QUERIES", [])
+    monkeypatch.setattr(settings, "WARMUP_ANSWER_TTL", 0.01)
+
+    engine = LangGraphEngine(rag_chain=mock_rag_chain, llm=mock_llm, cache=DiskCache(str(tmp_path / "cache.sqlite3")))
+    prepopulate_answers(engine, ["What is RAG?", "What is FAISS?"])
+    time.sleep(0.02)
+    # Live traffic caches one of them again
+    engine.handle("What is FAISS?")
+    mock_rag_chain.run.reset_mock()
+
+    monkeypatch.setattr(engine, "handle", Mock(wraps=engine.handle))
+    warm_up(engine)
+    # The expired answer is not replayed as a live LLM call
+    assert [c.args[0] for c in engine.handle.call_args_list] == ["What is FAISS?"]
+    mock_rag_chain.run.assert_not_called()
+
+
+def test_warmup_job_says_questions_are_unused_without_shared_cache(tmp_path, monkeypatch, caplog):
+    import src.data_loader
+    import src.llm_wrappers
+    from src.warmup import main
+
+    path = str(tmp_path / "questions.json")
+    llm = Mock()
+    llm.invoke.return_value = "What is RAG?"
+    monkeypatch.setattr(src.data_loader, "load_and_split_pdf", lambda _: [Document(page_content="chunk")])
+    monkeypatch.setattr(src.llm_wrappers, "get_llm", lambda: llm)
+    monkeypatch.setattr(settings, "WARMUP_QUESTIONS_PATH", path)
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+
+    with caplog.at_level(logging.WARNING, logger="src.warmup"):
+        assert main() == 0
+    assert json.load(open(path)) == ["What is RAG?"]
+    assert f"does not read {path} at startup" in caplog.text
+
+
+def test_get_pipeline_builds_and_warms_once(monkeypatch):
+    import src.pipeline as pipeline_module
+
+    built = Mock(errors=[])
+    build = Mock(return_value=built)
+    warm = Mock()
+    monkeypatch.setattr(pipeline_module, "_pipeline", None)
+    monkeypatch.setattr(pipeline_module, "build_pipeline", build)
+    monkeypatch.setattr(pipeline_module, "warm_up", warm)
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", True)
+
+    assert pipeline_module.get_pipeline() is built
+    assert pipeline_module.get_pipeline() is built
+    build.assert_called_once()
+    warm.assert_called_once_with(built.engine, embeddings=built.embeddings, vectorstore=built.vectorstore)